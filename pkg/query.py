@@ -1,72 +1,147 @@
 import logging
+import re
+
 import duckdb
 
+import orjson
 import pyarrow as pa
 
 logger = logging.getLogger(__name__)
 
-from functools import partial
-from typing import Optional
+import asyncio
+import concurrent.futures
+from functools import lru_cache, partial
+from typing import Dict, Optional
 from . import db_async
-from .cache import retrieve
+from .cache import get_key, retrieve
+
+# In-flight entries keyed by cache key, used to coalesce concurrent identical
+# read queries into a single DB task. Each entry is [future, follower_count]:
+# the first arrival (leader) runs the task under its own query id; followers
+# await the future. If the leader's query id is cancelled (e.g. /cancel), the
+# work is re-dispatched under a fresh id for any followers, so only the
+# cancelling client observes the cancellation.
+_inflight: Dict[str, list] = {}
+
+
+def _complete_inflight(fut: "asyncio.Future", task: "asyncio.Task") -> None:
+    """Transfer a re-dispatched task's outcome onto the coalesced future."""
+    if fut.done():
+        return
+    if task.cancelled():
+        fut.cancel()
+    elif task.exception() is not None:
+        fut.set_exception(task.exception())
+        fut.exception()  # mark retrieved for waiterless futures
+    else:
+        fut.set_result(task.result())
+
+# Conventional SQL identifier grammar; precompiled so validation is one
+# C-level scan per name
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+@lru_cache(maxsize=1024)
+def _quote_ident(name):
+    """Make an identifier safe for SQL interpolation.
+
+    Plain identifiers pass through unquoted (keeping DuckDB's usual
+    case-insensitive resolution and stable SQL text); anything else is
+    double-quoted with embedded quotes escaped. Memoized since the same
+    table names repeat across requests.
+    """
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"Invalid identifier: {name!r}")
+    if _IDENT_RE.match(name):
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
 
 def insert_table_from_arrow_file(con, query):
     file_name = query.get("fileName")
-    table_name = query.get("tableName")
+    table_name = _quote_ident(query.get("tableName"))
     with pa.memory_map(file_name, 'r') as source:
+        # read_all over a memory map is zero-copy: the batch buffers reference
+        # the mapping instead of being copied into process memory
         arrow_file_data = pa.ipc.open_file(source).read_all()
-    con.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM arrow_file_data")
+        con.register("__arrow_tmp", arrow_file_data)
+        try:
+            con.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM __arrow_tmp")
+        finally:
+            con.unregister("__arrow_tmp")
 
-def get_arrow(con, sql):
+# Rows per Arrow record batch when streaming results
+ARROW_BATCH_SIZE = 2048
+
+
+def get_arrow_reader(con, sql):
+    """Execute a query and return a pa.RecordBatchReader over the result.
+
+    Streaming batches avoids materializing the full result (and, per row, a
+    Python tuple) before serialization starts.
+    """
     try:
-        logger.debug(f"Executing DuckDB query: {sql[:100]}{'...' if len(sql) > 100 else ''}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing DuckDB query: %s%s", sql[:100], '...' if len(sql) > 100 else '')
         result = con.query(sql)
         if result is None:
             # Create empty result set if the query returns no rows
             empty_schema = pa.schema([pa.field('empty', pa.null())])
-            arrow_result = pa.Table.from_batches([], schema=empty_schema)
-            return arrow_result
-        else:
-            try:
-                arrow_result = result.arrow()
-                logger.debug(f"Successfully converted query result to Arrow format ({arrow_result.num_rows} rows)")
-                return arrow_result
-            except Exception as e:
-                logger.error(f"Failed to convert result to Arrow: {str(e)}")
-                raise
-
+            return pa.RecordBatchReader.from_batches(empty_schema, [])
+        # to_arrow_reader replaced fetch_record_batch in newer duckdb releases
+        reader_fn = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+        return reader_fn(ARROW_BATCH_SIZE)
     except duckdb.Error as e:
-        logger.error(f"DuckDB error during query execution: {str(e)}")
+        logger.error("DuckDB error during query execution: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during query execution: {str(e)}")
+        logger.error("Unexpected error during query execution: %s", e)
         raise
 
 
+def get_arrow(con, sql):
+    return get_arrow_reader(con, sql).read_all()
+
+
 def arrow_to_bytes(arrow):
     sink = pa.BufferOutputStream()
     with pa.ipc.new_stream(sink, arrow.schema) as writer:
         writer.write(arrow)
-    return sink.getvalue().to_pybytes()
-
+    # getvalue() returns a pyarrow Buffer; a memoryview over it is bytes-like
+    # for WebSocket sends and caching without copying the whole payload again
+    return memoryview(sink.getvalue())
 
 
 def get_arrow_bytes(con, sql):
-    return arrow_to_bytes(get_arrow(con, sql))
+    # Write batch-by-batch so large results never exist as one Python-side table
+    reader = get_arrow_reader(con, sql)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+    return memoryview(sink.getvalue())
 
 
 def get_json(con, sql):
+    """Execute a query and return its rows as UTF-8 JSON bytes.
+
+    Returning orjson's bytes output directly lets the HTTP path send the
+    buffer as-is instead of re-encoding a str body per response.
+    """
     try:
-        logger.debug(f"Executing DuckDB query for JSON: {sql[:100]}{'...' if len(sql) > 100 else ''}")
-        result = con.query(sql).df()
-        json_result = result.to_json(orient="records")
-        logger.debug(f"Successfully converted query result to JSON format ({len(result)} rows)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing DuckDB query for JSON: %s%s", sql[:100], '...' if len(sql) > 100 else '')
+        # Encode straight from Arrow; a pandas DataFrame round-trip would
+        # materialize every column twice and run pandas' Python-level encoder
+        rows = get_arrow(con, sql).to_pylist()
+        json_result = orjson.dumps(rows, default=str)
+        logger.debug("Successfully converted query result to JSON format (%s rows)", len(rows))
         return json_result
     except duckdb.Error as e:
-        logger.error(f"DuckDB error during JSON query execution: {str(e)}")
+        logger.error("DuckDB error during JSON query execution: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during JSON query execution: {str(e)}")
+        logger.error("Unexpected error during JSON query execution: %s", e)
         raise
 
 
@@ -86,7 +161,7 @@ async def run_duckdb(cache, query, query_id: Optional[str] = None):
 
         sql = query.get("sql")
         command = query["type"]
-        logger.debug(f"run_duckdb executing command '{command}'")
+        logger.debug("run_duckdb executing command '%s'", command)
         if command == "exec":
             con.execute(sql)
             return {"type": "done"}
@@ -102,4 +177,42 @@ async def run_duckdb(cache, query, query_id: Optional[str] = None):
         else:
             raise ValueError(f"Unknown command {command}")
 
+    # Coalesce concurrent identical reads: N simultaneous requests for the
+    # same uncached query share one DB task instead of computing N times
+    command = query.get("type")
+    if command in ("arrow", "json") and query.get("sql"):
+        key = get_key(query["sql"], command)
+        entry = _inflight.get(key)
+        if entry is not None:
+            entry[1] += 1
+            logger.debug("Coalescing query with in-flight request (query_id: %s)", query_id)
+            # shield: a follower's cancellation must not cancel the shared task
+            return await asyncio.shield(entry[0])
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        _inflight[key] = [fut, 0]
+        try:
+            result = await db_async.run_db_task(_execute_with_cursor, query_id=query_id)
+        except (asyncio.CancelledError, concurrent.futures.CancelledError):
+            # Only the leader's query id was cancelled; followers coalesced
+            # onto fut never asked for that. Re-run the work for them under a
+            # fresh id and surface the cancellation to the leader alone.
+            if _inflight[key][1] and not fut.done():
+                rerun = asyncio.ensure_future(
+                    db_async.run_db_task(_execute_with_cursor, query_id=db_async.generate_query_id())
+                )
+                rerun.add_done_callback(partial(_complete_inflight, fut))
+            elif not fut.done():
+                fut.cancel()
+            raise
+        except BaseException as e:
+            if not fut.done():
+                fut.set_exception(e)
+                fut.exception()  # mark retrieved for waiterless futures
+            raise
+        finally:
+            _inflight.pop(key, None)
+        if not fut.done():
+            fut.set_result(result)
+        return result
+
     return await db_async.run_db_task(_execute_with_cursor, query_id=query_id)
@@ -3,15 +3,16 @@ import time
 from functools import partial
 from pathlib import Path
 import os
-import threading
+import signal
 import shutil
+import struct
 import asyncio
 import concurrent.futures
 from typing import Optional, Callable, Any
 
-import ujson
-import json
+import orjson
 import falcon.asgi
+import falcon.media
 from falcon import Request, Response, WebSocketDisconnected
 from falcon.asgi import WebSocket
 
@@ -20,30 +21,74 @@ from pkg.query import run_duckdb
 logger = logging.getLogger(__name__)
 
 
-# Flag to track if shutdown has been requested
-shutdown_requested = False
+# Set when the backend is shutting down or swapping connections; new queries
+# are rejected while it is set. is_set() is a single C-level check per query.
+SHUTDOWN = asyncio.Event()
 
 from . import db_async
 
+# Dedicated pool for blocking file I/O (project saves). DB work runs on
+# db_async.EXECUTOR; keeping copies off both that pool and the loop's default
+# executor means a long save cannot starve concurrent queries.
+_IO_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="io")
+
+# Error bodies share one shape, so splice the encoded message into a
+# pre-built byte template instead of building and encoding a dict each time
+_ERROR_TEMPLATE = b'{"success":false,"error":{"message":%b}}'
+
+
 def make_error_response(code, message):
-    error_body = {
-        "success": False,
-        "error": {
-            "message": message,
-        }
-    }
-    return json.dumps(error_body)
+    # orjson handles JSON string escaping; the result is bytes ready to send
+    return _ERROR_TEMPLATE % orjson.dumps(str(message))
+
+
+# Fully static payloads, encoded once at import
+_RESP_MISSING_QUERY_ID = make_error_response("MISSING_QUERY_ID", "Missing queryId in request")
+_RESP_SHUTDOWN_INITIATED = orjson.dumps({"success": True, "message": "Graceful shutdown initiated"})
+_RESP_CONNECTION_CLOSED = orjson.dumps({"success": True, "message": "Connection closed"})
+_RESP_CONNECTION_ALREADY_CLOSED = orjson.dumps({"success": True, "message": "Connection already closed"})
+_RESP_CONNECTION_REOPENED = orjson.dumps({"success": True, "message": "Connection reopened"})
+_RESP_MISSING_DB_PATH = make_error_response("MISSING_PATH", "dbPath is required for reopening connection")
+
+# Polling intervals for the WAL wait: start at 1ms and back off. DuckDB
+# usually removes the WAL within a few ms of FORCE CHECKPOINT, so a short
+# first tick resolves almost immediately while the cap keeps the syscall
+# count bounded for slow flushes. (The kernel-notification route — inotify —
+# has no stdlib binding, so a cheap backoff poll is the practical option.)
+_WAL_POLL_INITIAL_SEC = 0.001
+_WAL_POLL_MAX_SEC = 0.05
+
 
 # Wait briefly for .wal file to disappear automatically after checkpoint
-def _wait_for_wal_disappear(db_path: Optional[str], timeout_sec: float = 1.0, interval_sec: float = 0.05) -> None:
+# (sync form, for use off the event loop e.g. in the delayed shutdown thread)
+def _wait_for_wal_disappear(db_path: Optional[str], timeout_sec: float = 1.0) -> None:
     try:
         if not db_path:
             return
         wal_path = f"{db_path}.wal"
         start = time.time()
+        interval = _WAL_POLL_INITIAL_SEC
         # Wait up to timeout for DuckDB to remove the WAL after FORCE CHECKPOINT
         while os.path.exists(wal_path) and (time.time() - start) < timeout_sec:
-            time.sleep(interval_sec)
+            time.sleep(interval)
+            interval = min(interval * 2, _WAL_POLL_MAX_SEC)
+    except Exception:
+        # Best-effort; ignore any issues here
+        pass
+
+
+# Async form of the WAL wait: polls with asyncio.sleep so concurrent requests
+# keep being served while a save/reconnect is in flight
+async def _await_wal_disappear(db_path: Optional[str], timeout_sec: float = 1.0) -> None:
+    try:
+        if not db_path:
+            return
+        wal_path = f"{db_path}.wal"
+        start = time.time()
+        interval = _WAL_POLL_INITIAL_SEC
+        while os.path.exists(wal_path) and (time.time() - start) < timeout_sec:
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, _WAL_POLL_MAX_SEC)
     except Exception:
         # Best-effort; ignore any issues here
         pass
@@ -52,63 +97,185 @@ def _wait_for_wal_disappear(db_path: Optional[str], timeout_sec: float = 1.0, in
 
  
 
+# JSON payloads above this size have their UTF-8 decode run off the event loop
+_LARGE_JSON_THRESHOLD = 256 * 1024
+
+
 class Handler:
-    def done(self):
+    """Uniformly async response interface so handle_query can always await."""
+    async def done(self):
         raise Exception("NotImplementedException")
-    def arrow(self, _buffer):
+    async def arrow(self, _buffer):
         raise Exception("NotImplementedException")
-    def json(self, _data):
+    async def json(self, _data):
         raise Exception("NotImplementedException")
-    def error(self, _error):
+    async def error(self, _error):
         raise Exception("NotImplementedException")
 
 class WebSocketHandler(Handler):
     def __init__(self, ws):
         self.ws = ws
-    def done(self):
+    async def done(self):
         pass
     async def arrow(self, buffer):
         await self.ws.send_data(buffer)
     async def json(self, data):
+        # JSON results arrive as bytes; clients expect text frames for JSON,
+        # so decode here (the HTTP path sends the bytes untouched). The
+        # encode itself already ran in the DB worker thread; for multi-MB
+        # payloads the decode is O(n) too, so push it off the event loop
+        if isinstance(data, bytes):
+            if len(data) > _LARGE_JSON_THRESHOLD:
+                data = await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, data.decode)
+            else:
+                data = data.decode()
         await self.ws.send_text(data)
     async def error(self, error):
-        await self.ws.send_text(json.dumps({"error": str(error)}))
+        await self.ws.send_text(orjson.dumps({"error": str(error)}).decode())
+
+class BatchingWebSocketHandler(WebSocketHandler):
+    """Opt-in WebSocket handler that coalesces outgoing frames.
+
+    Responses are queued and a background sender packs everything that arrives
+    within a short window (up to a byte budget) into one binary frame of
+    length-prefixed messages: ``>I`` byte length followed by the message, for
+    each message. Clients enable it with ``?batch=1`` on the WebSocket URL and
+    must de-frame; bursts of small results then cost one TCP send instead of
+    one per response.
+    """
+    def __init__(self, ws, max_batch_bytes: int = 64 * 1024, window_sec: float = 0.001):
+        super().__init__(ws)
+        self.max_batch_bytes = max_batch_bytes
+        self.window_sec = window_sec
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def _send_loop(self):
+        while True:
+            frames = [await self.queue.get()]
+            size = len(frames[0])
+            # Pick up any completions that land within the window
+            try:
+                while size < self.max_batch_bytes:
+                    frame = await asyncio.wait_for(self.queue.get(), self.window_sec)
+                    frames.append(frame)
+                    size += len(frame)
+            except asyncio.TimeoutError:
+                pass
+            payload = b"".join(struct.pack(">I", len(f)) + f for f in frames)
+            await self.ws.send_data(payload)
+
+    async def aclose(self):
+        self._sender.cancel()
+
+    async def arrow(self, buffer):
+        # bytes.join in the sender accepts any buffer object, so memoryviews
+        # ride through the queue without being copied to bytes first
+        await self.queue.put(buffer)
+
+    async def json(self, data):
+        await self.queue.put(data.encode("utf-8") if isinstance(data, str) else data)
+
+    async def error(self, error):
+        await self.queue.put(orjson.dumps({"error": str(error)}))
+
+
+# Arrow HTTP responses above this size are streamed in chunks instead of
+# copied into one resp.data body
+_ARROW_STREAM_THRESHOLD = 256 * 1024
+_ARROW_STREAM_CHUNK = 128 * 1024
+
+
+async def _iter_chunks(buffer):
+    mv = memoryview(buffer)
+    for i in range(0, len(mv), _ARROW_STREAM_CHUNK):
+        yield bytes(mv[i:i + _ARROW_STREAM_CHUNK])
+
 
 class HTTPHandler(Handler):
     def __init__(self, resp):
         self.resp = resp
-    def done(self):
+    async def done(self):
         self.resp.text = ""
-    def arrow(self, buffer):
+    async def arrow(self, buffer):
         self.resp.content_type = "application/octet-stream"
-        self.resp.data = buffer
+        if len(buffer) > _ARROW_STREAM_THRESHOLD:
+            # Stream large results: uvicorn starts sending the first chunk
+            # while the rest is still being sliced, and no whole-payload bytes
+            # copy is ever made (memoryview slices copy per chunk only)
+            self.resp.content_length = len(buffer)
+            self.resp.stream = _iter_chunks(buffer)
+            return
+        # Falcon's HTTP body must be bytes proper; WebSocket sends stay zero-copy
+        self.resp.data = buffer if isinstance(buffer, bytes) else bytes(buffer)
         if hasattr(self.resp, 'text'):
             self.resp.text = None
-    def json(self, data):
+    async def json(self, data):
         self.resp.content_type = "application/json"
-        self.resp.text = data
-        if hasattr(self.resp, 'data'):
+        # data is already UTF-8 JSON bytes; assigning resp.data skips the
+        # encode falcon would do for a text body
+        if isinstance(data, bytes):
+            self.resp.data = data
+            self.resp.text = None
+        else:
+            self.resp.text = data
             self.resp.data = None
-    def error(self, error):
+    async def error(self, error):
         self.resp.status = falcon.HTTP_400
         self.resp.content_type = "application/json"
-        self.resp.text = make_error_response("QUERY_ERROR", str(error))
-        if hasattr(self.resp, 'data'):
-            self.resp.data = None
+        self.resp.data = make_error_response("QUERY_ERROR", str(error))
+        if hasattr(self.resp, 'text'):
+            self.resp.text = None
+
+async def _read_json_body(req: Request):
+    """Read and parse a JSON request body in one pass.
 
-def deactivate_backend(cache) -> None:
+    Bypasses falcon's media machinery (handler resolution plus stdlib
+    json.loads on a decoded str) in favor of reading the raw bytes once and
+    parsing them with orjson, which accepts bytes natively. Raises
+    orjson.JSONDecodeError (a ValueError) on malformed input.
+    """
+    body = await req.stream.read()
+    return orjson.loads(body)
+
+
+def _fast_copy(src: str, dst: str) -> None:
+    """Copy a database file, using os.copy_file_range where available.
+
+    copy_file_range keeps the data in the kernel (and can reflink on
+    btrfs/XFS or server-side copy on NFS), so multi-GB project files avoid
+    the userland read/write loop. Falls back to shutil.copy2 when the
+    syscall is missing or refuses the file pair (e.g. cross-device).
+    """
+    if not hasattr(os, "copy_file_range"):
+        shutil.copy2(src, dst)
+        return
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            src_fd = fsrc.fileno()
+            dst_fd = fdst.fileno()
+            while os.copy_file_range(src_fd, dst_fd, 1 << 30):
+                pass
+        shutil.copystat(src, dst)
+    except OSError as e:
+        logger.debug("copy_file_range failed (%s); falling back to shutil.copy2", e)
+        shutil.copy2(src, dst)
+
+
+async def deactivate_backend(cache) -> None:
     """Temporarily deactivate the backend for a connection change.
     - Block new queries
     - Cancel active queries and close their cursors
     - Clear cache
     - FORCE CHECKPOINT and close current GLOBAL_CON
     """
-    global shutdown_requested
     # Block new queries while we switch connections
-    shutdown_requested = True
+    SHUTDOWN.set()
 
-    # Cancel/close any active queries
+    # Cancel/close any active queries and drop pooled cursors tied to the
+    # connection being closed
     db_async.cancel_all_queries()
+    db_async.drain_cursor_pool()
 
     # Best-effort: clear cache to avoid stale results
     if cache:
@@ -117,53 +284,158 @@ def deactivate_backend(cache) -> None:
             cache.clear()
             logger.info("Cache cleared")
         except Exception as e:
-            logger.warning(f"Failed to clear cache (ignored): {e}")
+            logger.warning("Failed to clear cache (ignored): %s", e)
 
-    # Flush pending changes to disk and close current connection
+    # Flush pending changes to disk and close current connection. Checkpoint
+    # and close can block for tens to hundreds of ms on large databases, so
+    # run them on the I/O executor to keep serving other requests meanwhile
     if db_async.GLOBAL_CON:
+        loop = asyncio.get_running_loop()
         try:
             logger.info("Forcing checkpoint before closing current connection...")
-            db_async.GLOBAL_CON.execute("FORCE CHECKPOINT")
-            _wait_for_wal_disappear(db_async.DATABASE_PATH)
+            await loop.run_in_executor(_IO_EXECUTOR, db_async.GLOBAL_CON.execute, "FORCE CHECKPOINT")
+            await _await_wal_disappear(db_async.DATABASE_PATH)
         except Exception as e:
-            logger.warning(f"FORCE CHECKPOINT failed (continuing): {e}")
+            logger.warning("FORCE CHECKPOINT failed (continuing): %s", e)
         try:
             logger.info("Closing current DuckDB connection...")
-            db_async.GLOBAL_CON.close()
+            await loop.run_in_executor(_IO_EXECUTOR, db_async.GLOBAL_CON.close)
             logger.info("Closed current DuckDB connection")
         except Exception as e:
-            logger.warning(f"Error closing current connection (continuing): {e}")
+            logger.warning("Error closing current connection (continuing): %s", e)
 
 def activate_backend(new_database_path: str) -> None:
     """Activate the backend by opening a connection to the provided database and resume queries."""
-    global shutdown_requested
-    logger.info(f"Re-initializing global DuckDB connection to {new_database_path}")
+    logger.info("Re-initializing global DuckDB connection to %s", new_database_path)
     db_async.init_global_connection(new_database_path)
     logger.info("Global connection re-initialized to new project file")
     # Resume accepting queries
-    shutdown_requested = False
+    SHUTDOWN.clear()
+
+async def _handle_save_project_as(handler: Handler, cache, query, query_id: Optional[str]) -> None:
+    """Save the project database to a new path and reconnect to it.
+
+    Handled outside run_duckdb since it must swap the global connection.
+    """
+    source_path = query.get("sourcePath")
+    target_path = query.get("targetPath")
+    if not source_path or not target_path:
+        raise ValueError("Missing sourcePath or targetPath for saveProjectAs command")
+
+    logger.info("Starting Save Project As from %s to %s", source_path, target_path)
+    # Equal strings normalize equally — skip the abspath pair for the obvious
+    # no-op; otherwise normalize once and reuse
+    if source_path != target_path:
+        source_path = os.path.abspath(source_path)
+        target_path = os.path.abspath(target_path)
+    # If paths are identical, nothing to do
+    if source_path == target_path:
+        logger.info("Source and target paths are the same; nothing to do")
+        await handler.done()
+        return
+    loop = asyncio.get_running_loop()
+
+    try:
+        # Prepare: block queries, cancel actives, clear cache, checkpoint and close
+        await deactivate_backend(cache)
+
+        # Ensure target directory exists
+        try:
+            target_dir = os.path.dirname(target_path)
+            if target_dir:
+                os.makedirs(target_dir, exist_ok=True)
+        except Exception as e:
+            logger.warning("Failed to ensure target directory exists: %s", e)
+
+        # Copy database file to new location
+        logger.info("Copying database file to new location: %s", target_path)
+        await loop.run_in_executor(_IO_EXECUTOR, _fast_copy, source_path, target_path)
+        logger.info("Copy completed to %s", target_path)
+
+        # Reconnect to new database path and resume queries
+        activate_backend(target_path)
+
+        # Success response
+        await handler.done()
+    except Exception:
+        # If anything failed, try to re-open the old DB to remain usable
+        try:
+            if source_path:
+                logger.info("Attempting to restore connection to original database after failure...")
+                activate_backend(source_path)
+                logger.info("Restored connection to original database")
+        except Exception as restore_e:
+            logger.error("Failed to restore original database connection: %s", restore_e)
+        raise
+
+
+async def _run_duckdb_command(handler: Handler, cache, query, query_id: Optional[str]) -> bool:
+    """Default command path: execute via run_duckdb and send the result.
+
+    Returns False when an error response was sent, True otherwise, so
+    handle_query can preserve its early-exit behavior.
+    """
+    try:
+        result = await run_duckdb(cache, query, query_id=query_id)
+        sender = _RESULT_SENDERS.get(result["type"])
+        if sender is not None:
+            await sender(handler, result)
+        return True
+    except concurrent.futures.CancelledError:
+        logger.info("Query %s was cancelled", query_id)
+        await handler.error("Query was cancelled")
+        return False
+    except Exception as e:
+        logger.exception("Error processing command '%s' (query_id: %s): %s", query.get("type"), query_id, e)
+        await handler.error(e)
+        return False
+
+
+# Commands needing special treatment, keyed for O(1) dispatch in handle_query;
+# everything else falls through to _run_duckdb_command
+_COMMAND_HANDLERS: dict = {
+    "saveProjectAs": _handle_save_project_as,
+}
+
+
+# Maps a result dict's "type" to the handler call that sends it; each entry
+# returns the coroutine to await. Shared by the custom-handler and run_duckdb
+# result paths, replacing duplicated string-comparison chains
+_RESULT_SENDERS: dict = {
+    "done": lambda handler, result: handler.done(),
+    "arrow": lambda handler, result: handler.arrow(result.get("data")),
+    "json": lambda handler, result: handler.json(result.get("data")),
+}
+
 
 async def handle_query(handler: Handler, cache, query, query_id: Optional[str] = None, custom_handler: Optional[Callable[..., Any]] = None):
-    global shutdown_requested
     # Use client-provided query_id if present
     if query_id is None:
         query_id = query.get("queryId") or db_async.generate_query_id()
-    logger.debug(f"query={query} (query_id: {query_id})")
+    logger.debug("query=%s (query_id: %s)", query, query_id)
+    # Bind the error method once; it is called from six branches below and a
+    # local read is cheaper than a bound-method lookup per call
+    error = handler.error
     # Check if shutdown has been requested - don't process new queries
-    if shutdown_requested:
+    if SHUTDOWN.is_set():
         logger.warning("Rejecting query because shutdown has been requested")
-        await handler.error("Server is shutting down") if hasattr(handler.error, '__await__') else handler.error("Server is shutting down")
+        await error("Server is shutting down")
         return
-    start = time.time()
+    # perf_counter_ns is monotonic and stays in integer math; skip the clock
+    # reads entirely when nothing will log the result
+    timing = logger.isEnabledFor(logging.INFO)
+    start = time.perf_counter_ns() if timing else 0
     try:
         command = query["type"]
-        logger.info(f"Processing command: {command} (query_id: {query_id})")
-        if "sql" in query:
+        logger.info("Processing command: %s (query_id: %s)", command, query_id)
+        # Gate on the level so the slice and string build are skipped entirely
+        # when debug logging is off
+        if "sql" in query and logger.isEnabledFor(logging.DEBUG):
             sql = query["sql"]
             if len(sql) > 200:
-                logger.debug(f"SQL query first 200 chars: {sql[:200]}... (query_id: {query_id})")
+                logger.debug("SQL query first 200 chars: %s... (query_id: %s)", sql[:200], query_id)
             else:
-                logger.debug(f"Full SQL query: {sql} (query_id: {query_id})")
+                logger.debug("Full SQL query: %s (query_id: %s)", sql, query_id)
         # First, allow a custom handler to intercept/handle commands
         if custom_handler is not None:
             try:
@@ -178,96 +450,30 @@ async def handle_query(handler: Handler, cache, query, query_id: Optional[str] =
                     return
                 if isinstance(maybe_result, dict) and isinstance(maybe_result.get("type"), str):
                     rtype = maybe_result["type"]
-                    if rtype == "done":
-                        handler.done()
-                    elif rtype == "arrow":
-                        data = maybe_result.get("data")
-                        await handler.arrow(data) if hasattr(handler.arrow, '__await__') else handler.arrow(data)
-                    elif rtype == "json":
-                        data = maybe_result.get("data")
-                        await handler.json(data) if hasattr(handler.json, '__await__') else handler.json(data)
-                    else:
+                    sender = _RESULT_SENDERS.get(rtype)
+                    if sender is None:
                         raise ValueError(f"Unknown custom handler result type: {rtype}")
+                    await sender(handler, maybe_result)
                     return
             except Exception as e:
                 logger.exception(f"Error in custom handler for command '{command}' (query_id: {query_id}): {str(e)}")
-                await handler.error(e) if hasattr(handler.error, '__await__') else handler.error(e)
-                return
-
-        # Handle saveProjectAs separately since it needs to modify the global connection
-        if command == "saveProjectAs":
-            source_path = query.get("sourcePath")
-            target_path = query.get("targetPath")
-            if not source_path or not target_path:
-                raise ValueError("Missing sourcePath or targetPath for saveProjectAs command")
-
-            logger.info(f"Starting Save Project As from {source_path} to {target_path}")
-            # If paths are identical, nothing to do
-            if os.path.abspath(source_path) == os.path.abspath(target_path):
-                logger.info("Source and target paths are the same; nothing to do")
-                handler.done()
+                await error(e)
                 return
-            loop = asyncio.get_running_loop()
-
-            try:
-                # Prepare: block queries, cancel actives, clear cache, checkpoint and close
-                deactivate_backend(cache)
-
-                # Ensure target directory exists
-                try:
-                    target_dir = os.path.dirname(target_path)
-                    if target_dir and not os.path.exists(target_dir):
-                        os.makedirs(target_dir, exist_ok=True)
-                except Exception as e:
-                    logger.warning(f"Failed to ensure target directory exists: {e}")
 
-                # Copy database file to new location
-                logger.info(f"Copying database file to new location: {target_path}")
-                await loop.run_in_executor(None, lambda: shutil.copy2(source_path, target_path))
-                logger.info(f"Copy completed to {target_path}")
-
-                # Reconnect to new database path and resume queries
-                activate_backend(target_path)
-
-                # Success response
-                handler.done()
-            except Exception as e:
-                # If anything failed, try to re-open the old DB to remain usable
-                try:
-                    if source_path:
-                        logger.info("Attempting to restore connection to original database after failure...")
-                        activate_backend(source_path)
-                        logger.info("Restored connection to original database")
-                except Exception as restore_e:
-                    logger.error(f"Failed to restore original database connection: {restore_e}")
-                raise
-        else:
-            # For all other commands, delegate to run_duckdb which handles db_async encapsulation
-            try:
-                result = await run_duckdb(cache, query, query_id=query_id)
-                if result["type"] == "done":
-                    handler.done()
-                elif result["type"] == "arrow":
-                    await handler.arrow(result["data"]) if hasattr(handler.arrow, '__await__') else handler.arrow(result["data"])
-                elif result["type"] == "json":
-                    await handler.json(result["data"]) if hasattr(handler.json, '__await__') else handler.json(result["data"])
-            except concurrent.futures.CancelledError:
-                logger.info(f"Query {query_id} was cancelled")
-                await handler.error("Query was cancelled") if hasattr(handler.error, '__await__') else handler.error("Query was cancelled")
-                return
-            except Exception as e:
-                logger.exception(f"Error processing command '{command}' (query_id: {query_id}): {str(e)}")
-                await handler.error(e) if hasattr(handler.error, '__await__') else handler.error(e)
-                return
+        # Every command resolves to one prebuilt coroutine: table entries for
+        # special-cased commands, _run_duckdb_command for the rest
+        if await _COMMAND_HANDLERS.get(command, _run_duckdb_command)(handler, cache, query, query_id) is False:
+            return
     except KeyError as e:
         err_msg = f"Missing required key in query: {str(e)}"
         logger.exception(err_msg)
-        await handler.error(err_msg) if hasattr(handler.error, '__await__') else handler.error(err_msg)
+        await error(err_msg)
     except Exception as e:
         logger.exception(f"Error processing query: {str(e)}")
-        await handler.error(e) if hasattr(handler.error, '__await__') else handler.error(e)
-    total = round((time.time() - start) * 1_000)
-    logger.info(f"DONE. Query took {total} ms.")
+        await error(e)
+    if timing:
+        total = (time.perf_counter_ns() - start) // 1_000_000
+        logger.info("DONE. Query took %s ms.", total)
 
 class DuckDBResource:
     def __init__(self, cache, custom_handler: Optional[Callable[..., Any]] = None):
@@ -275,33 +481,19 @@ class DuckDBResource:
         self.custom_handler = custom_handler
     async def on_post(self, req: Request, resp: Response):
         try:
-            data = await req.media
+            data = await _read_json_body(req)
             # Use client-provided queryId if present
             query_id = data.get("queryId") or db_async.generate_query_id()
-            # Create a custom handler that can add the query ID to the response
-            class QueryTrackingHandler(HTTPHandler):
-                def __init__(self, resp, query_id):
-                    super().__init__(resp)
-                    self.query_id = query_id
-                def done(self):
-                    self.resp.set_header('X-Query-ID', self.query_id)
-                    super().done()
-                def arrow(self, buffer):
-                    self.resp.set_header('X-Query-ID', self.query_id)
-                    super().arrow(buffer)
-                def json(self, data):
-                    self.resp.set_header('X-Query-ID', self.query_id)
-                    super().json(data)
-                def error(self, error):
-                    self.resp.set_header('X-Query-ID', self.query_id)
-                    super().error(error)
-            handler = QueryTrackingHandler(resp, query_id)
+            # Every response path carries the query id, so set the header once
+            # up front instead of wrapping the handler in a per-request subclass
+            resp.set_header('X-Query-ID', query_id)
+            handler = HTTPHandler(resp)
             await handle_query(handler, self.cache, data, query_id, custom_handler=self.custom_handler)
         except Exception as e:
             logger.exception(f"Error handling POST request: {str(e)}")
             resp.status = falcon.HTTP_400
             resp.content_type = "application/json"
-            resp.text = make_error_response("REQUEST_ERROR", str(e))
+            resp.data = make_error_response("REQUEST_ERROR", str(e))
     async def on_get(self, req: Request, resp: Response):
         try:
             query_string = req.get_param("query")
@@ -310,10 +502,10 @@ class DuckDBResource:
                 resp.text = "Missing 'query' parameter"
                 return
             try:
-                data = json.loads(query_string)
+                data = orjson.loads(query_string)
                 handler = HTTPHandler(resp)
                 await handle_query(handler, self.cache, data, custom_handler=self.custom_handler)
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 logger.exception(f"Invalid JSON in query parameter: {str(e)}")
                 resp.status = falcon.HTTP_400
                 resp.text = f"Invalid JSON in 'query' parameter: {str(e)}"
@@ -321,118 +513,142 @@ class DuckDBResource:
             logger.exception(f"Error handling GET request: {str(e)}")
             resp.status = falcon.HTTP_400
             resp.content_type = "application/json"
-            resp.text = make_error_response("REQUEST_ERROR", str(e))
+            resp.data = make_error_response("REQUEST_ERROR", str(e))
     async def on_options(self, req: Request, resp: Response):
         resp.status = falcon.HTTP_200
+    @staticmethod
+    async def _receive_message(ws: WebSocket):
+        # falcon only exposes type-specific receive_text/receive_data, each of
+        # which discards frames of the other type. Pull the raw ASGI event so
+        # clients may send queries as BINARY frames, which skips the per-message
+        # UTF-8 decode (orjson parses bytes natively); TEXT frames still work.
+        event = await ws._receive()
+        message = event.get('bytes')
+        if message is None:
+            message = event.get('text')
+        if message is None:
+            raise falcon.errors.PayloadTypeError('Missing TEXT (0x01) or BINARY (0x02) payload')
+        return message
+
     async def on_websocket(self, req: Request, ws: WebSocket):
         await ws.accept()
+        # ?batch=1 opts in to coalesced, length-prefixed binary frames
+        batching = bool(req.get_param_as_bool('batch'))
+        handler = BatchingWebSocketHandler(ws) if batching else WebSocketHandler(ws)
         try:
             while True:
-                message = await ws.receive_text()
+                message = await self._receive_message(ws)
                 try:
-                    query = ujson.loads(message)
-                    handler = WebSocketHandler(ws)
+                    query = orjson.loads(message)
                     await handle_query(handler, self.cache, query, custom_handler=self.custom_handler)
                 except Exception as e:
                     logger.exception("Error processing WebSocket message")
-                    await ws.send_text(json.dumps({"error": str(e)}))
+                    await ws.send_text(orjson.dumps({"error": str(e)}).decode())
         except WebSocketDisconnected:
             logger.info("WebSocket disconnected")
+        finally:
+            if batching:
+                await handler.aclose()
 
 class CancelQueryResource:
     def __init__(self, cache):
         self.cache = cache
     async def on_post(self, req: Request, resp: Response):
         try:
-            data = await req.media
+            data = await _read_json_body(req)
             query_id = data.get("queryId")
             if not query_id:
                 resp.status = falcon.HTTP_400
                 resp.content_type = "application/json"
-                resp.text = make_error_response("MISSING_QUERY_ID", "Missing queryId in request")
+                resp.data = _RESP_MISSING_QUERY_ID
                 return
-            logger.info(f"Received cancellation request for query {query_id}")
+            logger.info("Received cancellation request for query %s", query_id)
             success = db_async.cancel_query(query_id)
             if success:
                 resp.status = falcon.HTTP_200
                 resp.content_type = "application/json"
-                resp.text = json.dumps({"success": True, "message": f"Query {query_id} cancelled successfully"})
+                resp.data = orjson.dumps({"success": True, "message": f"Query {query_id} cancelled successfully"})
             else:
                 resp.status = falcon.HTTP_404
                 resp.content_type = "application/json"
-                resp.text = make_error_response("QUERY_NOT_FOUND", f"Query {query_id} not found or already completed")
+                resp.data = make_error_response("QUERY_NOT_FOUND", f"Query {query_id} not found or already completed")
         except Exception as e:
             logger.exception(f"Error cancelling query: {str(e)}")
             resp.status = falcon.HTTP_500
             resp.content_type = "application/json"
-            resp.text = make_error_response("CANCEL_ERROR", str(e))
+            resp.data = make_error_response("CANCEL_ERROR", str(e))
 
 class ShutdownResource:
     def __init__(self, cache):
         self.cache = cache
     async def on_post(self, req: Request, resp: Response):
-        global shutdown_requested
         try:
             logger.info("Received shutdown request, preparing for graceful shutdown")
-            try:
-                # Mark for shutdown but don't close yet
-                shutdown_requested = True
-                # Cancel all active queries
-                db_async.cancel_all_queries()
-                # Clear the cache
-                if self.cache:
-                    logger.info("Clearing cache...")
-                    self.cache.clear()
-                    logger.info("Cache cleared successfully")
-                # Schedule the server to stop in a short while
-                def delayed_shutdown():
-                    logger.info("Performing delayed shutdown...")
-                    if db_async.GLOBAL_CON:
-                        try:
-                            # Force checkpoint to ensure all data is written to main DB file, not WAL
-                            logger.info("Forcing checkpoint to flush WAL to main database file...")
-                            db_async.GLOBAL_CON.execute("FORCE CHECKPOINT")
-                            logger.info("Checkpoint completed successfully")
-                            # Give DuckDB a brief moment to finalize WAL cleanup
-                            _wait_for_wal_disappear(db_async.DATABASE_PATH)
-                            logger.info("Closing global DuckDB connection...")
-                            db_async.GLOBAL_CON.close()
-                            logger.info("DuckDB connection closed successfully")
-
-                            # Best-effort: remove any remaining WAL file
+            # Mark for shutdown but don't close yet
+            SHUTDOWN.set()
+            # Cancel all active queries
+            db_async.cancel_all_queries()
+            # Clear the cache
+            if self.cache:
+                logger.info("Clearing cache...")
+                self.cache.clear()
+                logger.info("Cache cleared successfully")
+            # Schedule the server to stop in a short while
+            def delayed_shutdown():
+                logger.info("Performing delayed shutdown...")
+                if db_async.GLOBAL_CON:
+                    try:
+                        # Force checkpoint to ensure all data is written to main DB file, not WAL
+                        logger.info("Forcing checkpoint to flush WAL to main database file...")
+                        db_async.GLOBAL_CON.execute("FORCE CHECKPOINT")
+                        logger.info("Checkpoint completed successfully")
+                        # Give DuckDB a brief moment to finalize WAL cleanup
+                        _wait_for_wal_disappear(db_async.DATABASE_PATH)
+                        logger.info("Closing global DuckDB connection...")
+                        db_async.GLOBAL_CON.close()
+                        # Clear the global so the atexit close_global_connection
+                        # hook doesn't checkpoint an already-closed connection
+                        db_async.GLOBAL_CON = None
+                        logger.info("DuckDB connection closed successfully")
+
+                        # Best-effort: remove any remaining WAL file with a
+                        # single unlink instead of an exists+remove pair
+                        if db_async.DATABASE_PATH:
+                            wal_path = f"{db_async.DATABASE_PATH}.wal"
                             try:
-                                if db_async.DATABASE_PATH:
-                                    wal_path = f"{db_async.DATABASE_PATH}.wal"
-                                    if os.path.exists(wal_path):
-                                        logger.info(f"Removing remaining WAL file at shutdown: {wal_path}")
-                                        try:
-                                            os.remove(wal_path)
-                                            logger.info("WAL file removed")
-                                        except Exception as wal_e:
-                                            logger.warning(f"Could not remove WAL on shutdown: {wal_e}")
-                            except Exception as e2:
-                                logger.error(f"WAL cleanup error (ignored): {e2}")
-                        except Exception as e:
-                            logger.exception(f"Error during connection cleanup: {str(e)}")
-                    # Shut down shared executor to release threads
-                    db_async.shutdown_executor(wait=False)
-                    logger.info("Exiting process gracefully...")
-                    time.sleep(0.5)
-                    os._exit(0)
-                threading.Timer(1.0, delayed_shutdown).start()
-                resp.status = falcon.HTTP_200
-                resp.content_type = "application/json"
-                resp.text = json.dumps({"success": True, "message": "Graceful shutdown initiated"})
-            except Exception as e:
-                logger.exception(f"Error during graceful shutdown: {str(e)}")
-                resp.status = falcon.HTTP_500
-                resp.content_type = "application/json"
-                resp.text = make_error_response("SHUTDOWN_ERROR", str(e))
+                                os.unlink(wal_path)
+                                logger.info("Removed remaining WAL file at shutdown: %s", wal_path)
+                            except FileNotFoundError:
+                                pass
+                            except Exception as wal_e:
+                                logger.warning("Could not remove WAL on shutdown: %s", wal_e)
+                    except Exception as e:
+                        logger.exception(f"Error during connection cleanup: {str(e)}")
+                # Shut down shared executors to release threads
+                db_async.shutdown_executor(wait=False)
+                _IO_EXECUTOR.shutdown(wait=False)
+                logger.info("Exiting process gracefully...")
+                # Ask uvicorn to stop cooperatively: it finishes in-flight
+                # requests and runs lifespan shutdown, then the process exits
+                # normally. The hard exit only remains as a fallback if the
+                # signal is not acted on (e.g. an embedding without uvicorn).
+                os.kill(os.getpid(), signal.SIGTERM)
+                time.sleep(5.0)
+                os._exit(0)
+            # call_soon_threadsafe-style scheduling via call_later replaces a
+            # dedicated Timer thread; the short delay lets the 200 response
+            # flush before cleanup starts, and the blocking close runs off
+            # the event loop
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.2, lambda: loop.run_in_executor(_IO_EXECUTOR, delayed_shutdown))
+            resp.status = falcon.HTTP_200
+            resp.content_type = "application/json"
+            resp.data = _RESP_SHUTDOWN_INITIATED
         except Exception as e:
-            logger.exception(f"Unexpected error during shutdown: {str(e)}")
+            logger.exception(f"Error during graceful shutdown: {str(e)}")
             resp.status = falcon.HTTP_500
             resp.content_type = "application/json"
-            resp.text = make_error_response("SERVER_ERROR", str(e))
+            resp.data = make_error_response("SHUTDOWN_ERROR", str(e))
 
 class ConnectionManagementResource:
     """Resource for managing DuckDB connection during file operations on Windows since duckdb will lock the file to prevent any file operations"""
@@ -440,29 +656,31 @@ class ConnectionManagementResource:
     async def on_post(self, req: Request, resp: Response):
         # manipulate connection via db_async module to ensure shared state
         try:
-            data = await req.get_media()
+            data = await _read_json_body(req)
             action = data.get("action")
 
             if action == "close":
                 if db_async.GLOBAL_CON:
                     logger.info("Closing DuckDB connection to release file lock...")
+                    # Pooled cursors hold the file lock too; drop them first
+                    db_async.drain_cursor_pool()
                     db_async.GLOBAL_CON.close()
                     db_async.GLOBAL_CON = None
                     logger.info("DuckDB connection closed successfully")
                     resp.status = falcon.HTTP_200
                     resp.content_type = "application/json"
-                    resp.text = json.dumps({"success": True, "message": "Connection closed"})
+                    resp.data = _RESP_CONNECTION_CLOSED
                 else:
                     resp.status = falcon.HTTP_200
                     resp.content_type = "application/json"
-                    resp.text = json.dumps({"success": True, "message": "Connection already closed"})
+                    resp.data = _RESP_CONNECTION_ALREADY_CLOSED
 
             elif action == "reopen":
                 db_path = data.get("dbPath")
                 if not db_path:
                     resp.status = falcon.HTTP_400
                     resp.content_type = "application/json"
-                    resp.text = make_error_response("MISSING_PATH", "dbPath is required for reopening connection")
+                    resp.data = _RESP_MISSING_DB_PATH
                     return
 
                 if db_async.GLOBAL_CON:
@@ -470,29 +688,35 @@ class ConnectionManagementResource:
                     db_async.GLOBAL_CON.close()
                     db_async.GLOBAL_CON = None
 
-                logger.info(f"Reopening DuckDB connection to {db_path}...")
+                logger.info("Reopening DuckDB connection to %s...", db_path)
                 db_async.init_global_connection(db_path)
                 logger.info("DuckDB connection reopened successfully")
 
                 resp.status = falcon.HTTP_200
                 resp.content_type = "application/json"
-                resp.text = json.dumps({"success": True, "message": "Connection reopened"})
+                resp.data = _RESP_CONNECTION_REOPENED
             else:
                 resp.status = falcon.HTTP_400
                 resp.content_type = "application/json"
-                resp.text = make_error_response("INVALID_ACTION", f"Invalid action: {action}")
+                resp.data = make_error_response("INVALID_ACTION", f"Invalid action: {action}")
 
         except Exception as e:
             logger.exception(f"Error in connection management: {str(e)}")
             resp.status = falcon.HTTP_500
             resp.content_type = "application/json"
-            resp.text = make_error_response("CONNECTION_ERROR", str(e))
+            resp.data = make_error_response("CONNECTION_ERROR", str(e))
 
 # For backward compatibility for callers importing from pkg.server
 init_global_connection = db_async.init_global_connection
 
 def create_app(cache, *, custom_handler: Optional[Callable[..., Any]] = None):
     app = falcon.asgi.App(cors_enable=True)
+    # The hot endpoints parse bodies directly with orjson, but register it as
+    # the app-wide JSON media handler too so any req.media/resp.media use
+    # (custom handlers, future routes) gets the same encoder
+    json_handler = falcon.media.JSONHandler(dumps=orjson.dumps, loads=orjson.loads)
+    app.req_options.media_handlers[falcon.MEDIA_JSON] = json_handler
+    app.resp_options.media_handlers[falcon.MEDIA_JSON] = json_handler
     app.add_route('/', DuckDBResource(cache, custom_handler))
     app.add_route('/cancel', CancelQueryResource(cache))
     app.add_route('/shutdown', ShutdownResource(cache))
@@ -503,5 +727,7 @@ def create_app(cache, *, custom_handler: Optional[Callable[..., Any]] = None):
 def server(cache, port=4000):
     import uvicorn
     app = create_app(cache)
-    logger.info(f"Falcon DuckDB Server listening at ws://localhost:{port} and http://localhost:{port}")
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
+    logger.info("Falcon DuckDB Server listening at ws://localhost:%s and http://localhost:%s", port, port)
+    # "auto" selects uvloop and httptools when installed (uvicorn[standard]),
+    # falling back to asyncio/h11 where they are unavailable
+    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info", loop="auto", http="auto")
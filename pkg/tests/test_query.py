@@ -3,14 +3,17 @@ from functools import partial
 import duckdb
 import pyarrow as pa
 
-from pkg.query import get_arrow, get_json
+import pytest
+
+from pkg.query import _quote_ident, get_arrow, get_arrow_bytes, get_json
 
 
 
 def test_query_json():
     con = duckdb.connect()
 
-    assert partial(get_json, con)("SELECT 1 AS a") == '[{"a":1}]'
+    # get_json returns UTF-8 bytes straight from orjson
+    assert partial(get_json, con)("SELECT 1 AS a") == b'[{"a":1}]'
 
 
 def test_query_arrow():
@@ -20,3 +23,25 @@ def test_query_arrow():
     table = pa.Table.from_pylist([{"a": 1}], schema=my_schema)
 
     assert partial(get_arrow, con)("SELECT 1 AS a") == table
+
+
+def test_query_arrow_bytes():
+    con = duckdb.connect()
+
+    # Cached entries are bytes-like Arrow IPC stream data, servable to clients
+    # verbatim; a memoryview keeps the serialized buffer zero-copy
+    buffer = partial(get_arrow_bytes, con)("SELECT 1 AS a")
+    assert isinstance(buffer, (bytes, memoryview))
+
+    table = pa.ipc.open_stream(buffer).read_all()
+    assert table.to_pylist() == [{"a": 1}]
+
+
+def test_quote_ident():
+    assert _quote_ident("my_table") == "my_table"
+    assert _quote_ident('weird "name"; DROP TABLE x') == '"weird ""name""; DROP TABLE x"'
+
+    with pytest.raises(ValueError):
+        _quote_ident(None)
+    with pytest.raises(ValueError):
+        _quote_ident("")